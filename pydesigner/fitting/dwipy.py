@@ -1,10 +1,10 @@
+import functools
 import multiprocessing
 import os
 import os.path as op
 import random
 from typing import List, Self, Tuple, Union
 
-import cvxpy as cvx
 import nibabel as nib
 import numpy as np
 import numpy.matlib as npm
@@ -13,23 +13,242 @@ from joblib import Parallel, delayed
 from scipy.special import factorial, gamma, hyp1f1
 from tqdm import tqdm
 
-from ..plotting import outlierplot
 from ..system.utils import highprecisionexp, highprecisionpower, vectorize, writeNii
-from ..tractography import dsistudio, odf, sphericalsampling
 from . import dwi_fnames, dwidirs
 from . import thresholds as th
 
+# cvxpy, matplotlib (via ..plotting.outlierplot) and dipy (via
+# ..tractography) are expensive to import and only needed by specific
+# stages; they are imported inside the methods that use them so worker
+# processes importing this module for the batched fit do not pay for
+# them
+
+try:
+    import numba
+
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
+
+
+def _cupy():
+    """Imports cupy on demand for the GPU tensor fit; raises a helpful
+    error when the optional dependency is missing."""
+    try:
+        import cupy
+    except ImportError:
+        raise ImportError(
+            "GPU tensor fitting requires cupy; install it with " "pip install pydesigner[gpu] on a CUDA-capable system"
+        )
+    return cupy
+
+
 # Define the lowest number possible before it is considered a zero
 minZero = th.__minZero__
 # Define number of directions to resample after computing all tensors
 dirSample = th.__dirs__
 # Progress bar Properties
 tqdmWidth = 70  # Number of columns of progress bar
+# Number of voxels per tile in the batched WLLS solve; bounds the
+# (tile x 22 x 22) normal-equations workspace to a few hundred MB
+wllsBlockSize = 65536
+# Tikhonov ridge added to the diagonal of the WLLS normal equations
+wllsRidge = 1e-6
 # Set default numpy errorstates
 np.seterr(all="ignore")
 defaultErrorState = np.geterr()
 
 
+if _HAS_NUMBA:
+
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _wlls_fit_all(b, w2, logdwi):  # pragma: no cover
+        """Native-compiled inner loop of the batched WLLS fit. Builds
+        and solves the weighted normal equations voxel-by-voxel with
+        prange so the fixed-size [nparam x nparam] systems stay in
+        registers/cache. Called only when numba is installed; see
+        DWI.wlls_batched() for the reference NumPy implementation.
+        """
+        ndir, nparam = b.shape
+        nvox = w2.shape[1]
+        out = np.empty((nvox, nparam), dtype=b.dtype)
+        for v in numba.prange(nvox):
+            A = np.eye(nparam, dtype=b.dtype)
+            A *= wllsRidge
+            rhs = np.zeros(nparam, dtype=b.dtype)
+            for n in range(ndir):
+                wn = w2[n, v]
+                if wn != 0.0:
+                    y = wn * logdwi[n, v]
+                    for k in range(nparam):
+                        rhs[k] += b[n, k] * y
+                        for m in range(nparam):
+                            A[k, m] += b[n, k] * wn * b[n, m]
+            out[v] = np.linalg.solve(A, rhs)
+        return out
+
+
+@functools.lru_cache(maxsize=16)
+def _load_grad_cached(bvecPath: str, bvalPath: str, bvec_mtime: float, bval_mtime: float) -> np.ndarray[float]:
+    """Parses and caches a gradient table. Keyed on path and mtime so a
+    rewritten file invalidates its entry; see _load_grad()."""
+    # Load bvecs
+    bvecs = np.loadtxt(bvecPath)
+    # Load bvals
+    bvals = np.loadtxt(bvalPath)
+    # Scale bvals to ms/um2 by checking for number of digits
+    # in max bval
+    if int(np.log10(np.max(bvals))) + 1 >= 3:  # if no. of digits >= 3
+        bvals = bvals / 1000
+    # Combine bvecs and bvals into [n x 4] array where n is
+    # number of DWI volumes. [Gx Gy Gz Bval]; column_stack avoids the
+    # transpose copy of np.c_
+    grad = np.column_stack((np.transpose(bvecs), bvals))
+    grad.setflags(write=False)
+    return grad
+
+
+def _load_grad(bvecPath: str, bvalPath: str) -> np.ndarray[float]:
+    """Returns the [n x 4] gradient table for a .bvec/.bval pair.
+
+    Text parsing in np.loadtxt is pure Python and re-ran for every DWI
+    constructed, so the result is memo-cached per (path, mtime) and
+    returned read-only; DWI objects sharing a gradient table parse it
+    once.
+
+    Parameters
+    ----------
+    bvecPath: str
+        Path to .bvec gradient vector file.
+    bvalPath: str
+        Path to .bval b-value file.
+
+    Returns
+    -------
+    grad: ndarray(dtype=float)
+        [n x 4] read-only gradient and bvalue scheme.
+    """
+    return _load_grad_cached(bvecPath, bvalPath, os.path.getmtime(bvecPath), os.path.getmtime(bvalPath))
+
+
+@functools.lru_cache(maxsize=4)
+def _tensor_order(order: int) -> Tuple[np.ndarray[int], np.ndarray[int]]:
+    """Returns cached tensor order count and indices for a given order.
+    The arrays are constant per order, so they are built once and marked
+    read-only instead of being reallocated inside per-voxel loops. See
+    DWI.createTensorOrder() for the layout.
+
+    Parameters
+    ----------
+    order: int
+        Tensor order number, 2 for diffusion and 4 for kurtosis.
+
+    Returns
+    -------
+    cnt: ndarray(dtype=int)
+        Count of number of times a tensor appears.
+    ind: ndarray(dtype=int)
+        Indices of count.
+    """
+    if order == 2:
+        cnt = np.array([1, 2, 2, 1, 2, 1], dtype=int)
+        ind = np.array(([1, 1], [1, 2], [1, 3], [2, 2], [2, 3], [3, 3])) - 1
+    elif order == 4:
+        cnt = np.array([1, 4, 4, 6, 12, 6, 4, 12, 12, 4, 1, 4, 6, 4, 1], dtype=int)
+        ind = (
+            np.array(
+                (
+                    [1, 1, 1, 1],
+                    [1, 1, 1, 2],
+                    [1, 1, 1, 3],
+                    [1, 1, 2, 2],
+                    [1, 1, 2, 3],
+                    [1, 1, 3, 3],
+                    [1, 2, 2, 2],
+                    [1, 2, 2, 3],
+                    [1, 2, 3, 3],
+                    [1, 3, 3, 3],
+                    [2, 2, 2, 2],
+                    [2, 2, 2, 3],
+                    [2, 2, 3, 3],
+                    [2, 3, 3, 3],
+                    [3, 3, 3, 3],
+                )
+            )
+            - 1
+        )
+    else:
+        raise ValueError("createTensorOrder: Please enter valid " "order values (2 or 4).")
+    cnt.setflags(write=False)
+    ind.setflags(write=False)
+    return cnt, ind
+
+
+# Design matrices memoized per gradient scheme; see _design_matrix
+_bmatCache = {}
+
+
+def _design_matrix(grad: np.ndarray[float]) -> np.ndarray[float]:
+    """Assembles the [ndir x 22] DKI design matrix for a gradient
+    scheme. The matrix is a pure function of the gradient table and
+    acquisitions reuse a handful of canonical schemes, so the result is
+    memo-cached on the rounded table bytes and shared read-only across
+    fits and DWI instances.
+
+    Parameters
+    ----------
+    grad: ndarray(dtype=float)
+        [ndir x 4] gradient directions and b-values for the volumes
+        entering the fit.
+
+    Returns
+    -------
+    b: ndarray(dtype=float32)
+        [ndir x 22] read-only design matrix; column 0 is the constant
+        term, columns 1-6 the diffusion monomials and columns 7-21 the
+        kurtosis monomials.
+    """
+    key = grad.round(6).tobytes()
+    cached = _bmatCache.get(key)
+    if cached is not None:
+        return cached
+    grad = grad.copy()
+    grad_orig = grad
+    bvals = grad[:, -1].copy()
+    normgrad = np.sqrt(np.sum(grad[:, :3] ** 2, 1))
+    normgrad[normgrad == 0] = 1
+    grad[:, :3] = grad[:, :3] / np.tile(normgrad, (3, 1)).T
+    grad[np.isnan(grad)] = 0
+    dcnt, dind = _tensor_order(2)
+    wcnt, wind = _tensor_order(4)
+    ndwis = grad.shape[0]
+    bs = np.ones((ndwis, 1))
+    bD = np.tile(dcnt, (ndwis, 1)) * grad[:, dind[:, 0]] * grad[:, dind[:, 1]]
+    bW = (
+        np.tile(wcnt, (ndwis, 1))
+        * grad_orig[:, wind[:, 0]]
+        * grad_orig[:, wind[:, 1]]
+        * grad_orig[:, wind[:, 2]]
+        * grad_orig[:, wind[:, 3]]
+    )
+    # Single precision is ample for the fit (signal SNR <= ~30) and
+    # keeps the batched BLAS calls in the cheaper sgemm/sgesv paths
+    b = np.concatenate(
+        (
+            bs,
+            (np.tile(-bvals, (6, 1)).T * bD),
+            np.squeeze(1 / 6 * np.tile(bvals, (15, 1)).T ** 2) * bW,
+        ),
+        1,
+    ).astype(np.float32)
+    b.setflags(write=False)
+    if len(_bmatCache) >= 8:
+        # Drop the oldest scheme; pipelines rarely see more than a few
+        _bmatCache.pop(next(iter(_bmatCache)))
+    _bmatCache[key] = b
+    return b
+
+
 class DWI(object):
     """The DWI object handles tensor estimation and parameter extraction
     of dwiffusion weighted images.
@@ -39,7 +258,9 @@ class DWI(object):
     hdr: class
         Nibabel class object of input nifti file.
     img: ndarray
-        3D or 4D input image array.
+        3D or 4D input image array. Loaded lazily from the nibabel
+        ``ArrayProxy`` on first access; use DWI.get_block() to read a
+        sub-volume without materializing the entire image.
     grad: ndarray
         [N x 4] gradient and bvalue scheme, where the first three
         columns are the X, Y, and Z gradient vectors respectively, and
@@ -79,9 +300,13 @@ class DWI(object):
         if not os.path.exists(imPath):
             raise OSError("Input image {} not found".format(imPath))
         self.hdr = nib.load(imPath)
-        self.img = np.array(self.hdr.dataobj)
-        truncateIdx = np.logical_or(np.isnan(self.img), (self.img < minZero))
-        self.img[truncateIdx] = minZero
+        # Keep the nibabel ArrayProxy around instead of greedily
+        # reading the entire 4D volume into RAM; the full array is
+        # materialized on first access of DWI.img
+        self._img = None
+        # Reusable log-signal workspace for DWI.fit(); allocated on
+        # first fit and recycled across calls
+        self._logbuf = None
         # Get just NIFTI filename + extensio
         (path, file) = os.path.split(imPath)
         # Remove extension from NIFTI filename
@@ -101,17 +326,12 @@ class DWI(object):
         else:
             bvalPath = os.path.join(path, fName + ".bval")
         if os.path.exists(bvalPath) and os.path.exists(bvecPath):
-            # Load bvecs
-            bvecs = np.loadtxt(bvecPath)
-            # Load bvals
-            bvals = np.loadtxt(bvalPath)
-            # Scale bvals to ms/um2 by checking for number of digits
-            # in max bval
-            if int(np.log10(np.max(bvals))) + 1 >= 3:  # if no. of digits >= 3
-                bvals = bvals / 1000
-            # Combine bvecs and bvals into [n x 4] array where n is
-            # number of DWI volumes. [Gx Gy Gz Bval]
-            self.grad = np.c_[np.transpose(bvecs), bvals]
+            grad = _load_grad(bvecPath, bvalPath)
+            # Structure-of-arrays layout: directions and b-values kept
+            # as separate unit-stride arrays so the design-matrix
+            # builds read contiguous memory instead of strided views
+            self.bvecs = np.ascontiguousarray(grad[:, :3])
+            self.bvals = np.ascontiguousarray(grad[:, 3])
         else:
             raise OSError("Unable to locate BVAL or BVEC files")
         if mask is None:
@@ -123,7 +343,7 @@ class DWI(object):
             self.mask = np.array(tmp.dataobj).astype(bool)
             self.maskStatus = True
         else:
-            self.mask = np.ones((self.img.shape[0], self.img.shape[1], self.img.shape[2]), order="F")
+            self.mask = np.ones((self.hdr.shape[0], self.hdr.shape[1], self.hdr.shape[2]), order="F")
             self.maskStatus = False
             print("No brain mask supplied")
         tqdm.write("Image " + fName + ".nii loaded successfully")
@@ -141,6 +361,98 @@ class DWI(object):
         else:
             tqdm.write("Processing with " + str(self.workers) + " workers...")
 
+    @property
+    def img(self) -> np.ndarray[float]:
+        """Full 3D or 4D image array, materialized from the on-disk
+        ``ArrayProxy`` on first access and cached thereafter.
+
+        Returns
+        -------
+        ndarray(dtype=float32)
+            3D or 4D input image array. Held in single precision:
+            diffusion signal SNR is well below the ~7 significant
+            digits float32 carries, and halving the bytes halves
+            memory traffic in the fit.
+        """
+        if self._img is None:
+            # np.require copies only if the proxy hands back a
+            # read-only memory map
+            img = np.asanyarray(self.hdr.dataobj).astype(np.float32, copy=False)
+            img = np.require(img, requirements="W")
+            truncateIdx = np.logical_or(np.isnan(img), (img < minZero))
+            img[truncateIdx] = minZero
+            self._img = img
+        return self._img
+
+    def get_block(self, zslice: Union[slice, None] = None, vol_slice: Union[slice, None] = None) -> np.ndarray[float]:
+        """Reads a sub-volume of the input image directly from disk
+        without materializing the entire 4D array.
+
+        Parameters
+        ----------
+        zslice: slice, optional
+            Range of z-slices to read (Default: all slices).
+        vol_slice: slice, optional
+            Range of DWI volumes to read (Default: all volumes).
+
+        Returns
+        -------
+        block: ndarray(dtype=float32)
+            Requested sub-volume of the input image.
+
+        Examples
+        --------
+        slab = dwi.get_block(zslice=slice(0, 8))
+        """
+        if zslice is None:
+            zslice = slice(None)
+        if vol_slice is None:
+            vol_slice = slice(None)
+        block = np.asanyarray(self.hdr.dataobj[:, :, zslice, vol_slice]).astype(np.float32, copy=False)
+        block = np.require(block, requirements="W")
+        truncateIdx = np.logical_or(np.isnan(block), (block < minZero))
+        block[truncateIdx] = minZero
+        return block
+
+    def iter_zslabs(self, nz: int = 8):
+        """Iterates over the input image in z-slabs read directly from
+        disk, so only ``nz`` slices (times all volumes) are ever
+        decompressed and scaled into RAM at a time. Useful for driving
+        voxelwise fits over a volume too large to materialize whole.
+
+        Parameters
+        ----------
+        nz: int, optional
+            Number of z-slices per slab (Default: 8).
+
+        Yields
+        ------
+        z0: int
+            Index of the first z-slice in the slab.
+        slab: ndarray(dtype=float32)
+            [nx x ny x nz x nvol] sub-volume starting at z0.
+
+        Examples
+        --------
+        for z0, slab in dwi.iter_zslabs(nz=8): ...
+        """
+        for z0 in range(0, self.hdr.shape[2], nz):
+            yield z0, self.get_block(zslice=slice(z0, z0 + nz))
+
+    @property
+    def grad(self) -> np.ndarray[float]:
+        """Backwards-compatible [N x 4] gradient table assembled from
+        the structure-of-arrays ``bvecs`` and ``bvals`` attributes.
+
+        Returns
+        -------
+        ndarray(dtype=float)
+            [N x 4] array where the first three columns are gradient
+            directions and the last is b-values. A fresh copy on every
+            access; prefer ``bvecs``/``bvals`` in new code.
+        """
+        return np.column_stack((self.bvecs, self.bvals))
+
     def getBvals(self) -> np.ndarray:
         """Returns a vector of b-values, requires no input arguments.
 
@@ -153,7 +465,7 @@ class DWI(object):
         --------
         bvals = dwi.getBvals(), where dwi is the DWI class object.
         """
-        return self.grad[:, 3]
+        return self.bvals
 
     def getBvecs(self) -> np.ndarray:
         """Returns an array of gradient vectors, requires no input
@@ -168,7 +480,7 @@ class DWI(object):
         --------
         bvecs = dwi.getBvecs(), where dwi is the DWI class object.
         """
-        return self.grad[:, 0:3]
+        return self.bvecs
 
     def maxBval(self) -> float:
         """Returns the maximum b-value in a dataset to determine between
@@ -184,7 +496,7 @@ class DWI(object):
         a = dwi.maxBval(), where dwi is the DWI class object.
 
         """
-        return max(np.unique(self.grad[:, 3])).astype(int)
+        return max(np.unique(self.bvals)).astype(int)
 
     def maxDTIBval(self) -> float:
         """Returns the maximum DTI b-value in a dataset.
@@ -199,8 +511,8 @@ class DWI(object):
         a = dwi.maxDKIBval(), where dwi is the DWI class object
 
         """
-        exclude_idx = self.grad[:, 3] <= th.__maxdtibval__
-        return max(np.unique(self.grad[exclude_idx, 3])).astype(int)
+        exclude_idx = self.bvals <= th.__maxdtibval__
+        return max(np.unique(self.bvals[exclude_idx])).astype(int)
 
     def maxDKIBval(self) -> float:
         """Returns the maximum DKI b-value in a dataset.
@@ -215,8 +527,8 @@ class DWI(object):
         a = dwi.maxDKIBval(), where dwi is the DWI class object
 
         """
-        exclude_idx = self.grad[:, 3] <= th.__maxdkibval__
-        return max(np.unique(self.grad[exclude_idx, 3])).astype(int)
+        exclude_idx = self.bvals <= th.__maxdkibval__
+        return max(np.unique(self.bvals[exclude_idx])).astype(int)
 
     def maxFBIBval(self) -> float:
         """Returns the maximum FBI b-value in a dataset.
@@ -231,8 +543,8 @@ class DWI(object):
         a = dwi.maxDKIBval(), where dwi is the DWI class object
 
         """
-        exclude_idx = self.grad[:, 3] <= th.__maxfbibval__
-        return max(np.unique(self.grad[exclude_idx, 3])).astype(int)
+        exclude_idx = self.bvals <= th.__maxfbibval__
+        return max(np.unique(self.bvals[exclude_idx])).astype(int)
 
     def idxb0(self) -> np.ndarray[bool]:
         """Returns the index of all B-zeros according to bvals
@@ -244,7 +556,7 @@ class DWI(object):
             Index of DTI/DKI b-values.
 
         """
-        return np.rint(self.grad[:, 3]) == 0
+        return np.rint(self.bvals) == 0
 
     def idxdti(self) -> np.ndarray[bool]:
         """Returns the index of all DTI/DKI B-values according to bvals
@@ -256,9 +568,9 @@ class DWI(object):
             Index of DTI/DKI b-values.
 
         """
-        idx = np.ones_like(self.grad[:, -1], dtype=bool)
+        idx = np.ones_like(self.bvals, dtype=bool)
         if self.isdti():
-            idx = self.grad[:, 3] <= self.maxDTIBval()
+            idx = self.bvals <= self.maxDTIBval()
         return idx
 
     def idxdki(self) -> np.ndarray[bool]:
@@ -271,9 +583,9 @@ class DWI(object):
             Index of DTI/DKI b-values
 
         """
-        idx = np.ones_like(self.grad[:, -1], dtype=bool)
+        idx = np.ones_like(self.bvals, dtype=bool)
         if self.isdki():
-            idx = self.grad[:, 3] <= self.maxDKIBval()
+            idx = self.bvals <= self.maxDKIBval()
         return idx
 
     def idxfbi(self) -> np.ndarray[int]:
@@ -286,9 +598,9 @@ class DWI(object):
             Index of DTI/DKI b-values.
 
         """
-        idx = np.ones_like(self.grad[:, 3], dtype=bool)
+        idx = np.ones_like(self.bvals, dtype=bool)
         if self.isfbi():
-            idx = np.rint(self.grad[:, -1]) == np.rint(self.maxFBIBval())
+            idx = np.rint(self.bvals) == np.rint(self.maxFBIBval())
         else:
             raise IndexError("No valid FBI sequence found.")
         return idx
@@ -306,7 +618,7 @@ class DWI(object):
         --------
         n = dwi.getndirs(), where dwi is the DWI class object
         """
-        return np.sum(self.grad[:, 3] == self.maxDKIBval())
+        return np.sum(self.bvals == self.maxDKIBval())
 
     def tensorType(self) -> List[str]:
         """Returns whether input image is DTI or DKI compatible, requires
@@ -433,6 +745,9 @@ class DWI(object):
 
         Notes
         -----
+        The returned arrays are cached per order and marked read-only;
+        copy them before modifying.
+
         The tensors for this pipeline are based on NYU's designer layout as
         depicted in the table below. This will soon be depreciated and
         updated with MRTRIX3's layout.
@@ -464,63 +779,8 @@ class DWI(object):
             15 |   W3333
         """
         if order is None:
-            if self.isdki():
-                cnt = np.array([1, 4, 4, 6, 12, 6, 4, 12, 12, 4, 1, 4, 6, 4, 1], dtype=int)
-                ind = (
-                    np.array(
-                        (
-                            [1, 1, 1, 1],
-                            [1, 1, 1, 2],
-                            [1, 1, 1, 3],
-                            [1, 1, 2, 2],
-                            [1, 1, 2, 3],
-                            [1, 1, 3, 3],
-                            [1, 2, 2, 2],
-                            [1, 2, 2, 3],
-                            [1, 2, 3, 3],
-                            [1, 3, 3, 3],
-                            [2, 2, 2, 2],
-                            [2, 2, 2, 3],
-                            [2, 2, 3, 3],
-                            [2, 3, 3, 3],
-                            [3, 3, 3, 3],
-                        )
-                    )
-                    - 1
-                )
-            else:
-                cnt = np.array([1, 2, 2, 1, 2, 1], dtype=int)
-                ind = np.array(([1, 1], [1, 2], [1, 3], [2, 2], [2, 3], [3, 3])) - 1
-        elif order == 2:
-            cnt = np.array([1, 2, 2, 1, 2, 1], dtype=int)
-            ind = np.array(([1, 1], [1, 2], [1, 3], [2, 2], [2, 3], [3, 3])) - 1
-        elif order == 4:
-            cnt = np.array([1, 4, 4, 6, 12, 6, 4, 12, 12, 4, 1, 4, 6, 4, 1], dtype=int)
-            ind = (
-                np.array(
-                    (
-                        [1, 1, 1, 1],
-                        [1, 1, 1, 2],
-                        [1, 1, 1, 3],
-                        [1, 1, 2, 2],
-                        [1, 1, 2, 3],
-                        [1, 1, 3, 3],
-                        [1, 2, 2, 2],
-                        [1, 2, 2, 3],
-                        [1, 2, 3, 3],
-                        [1, 3, 3, 3],
-                        [2, 2, 2, 2],
-                        [2, 2, 2, 3],
-                        [2, 2, 3, 3],
-                        [2, 3, 3, 3],
-                        [3, 3, 3, 3],
-                    )
-                )
-                - 1
-            )
-        else:
-            raise ValueError("createTensorOrder: Please enter valid " "order values (2 or 4).")
-        return cnt, ind
+            order = 4 if self.isdki() else 2
+        return _tensor_order(order)
 
     def fibonacciSphere(self, samples: int = 1, randomize: bool = True) -> np.ndarray[float]:
         """Returns evenly spaced points on a sphere.
@@ -612,9 +872,16 @@ class DWI(object):
         adc = dwi.diffusionCoeff(dt, dir)
         """
         dcnt, dind = self.createTensorOrder(2)
-        ndir = dir.shape[0]
-        bD = np.tile(dcnt, (ndir, 1)) * dir[:, dind[:, 0]] * dir[:, dind[:, 1]]
-        adc = np.matmul(bD, dt)
+        # Accept both the batched [6 x nvox] layout and the 1-D
+        # per-voxel vector handed in by dkiTensorParams
+        dt2 = dt.reshape(dcnt.size, -1) if dt.ndim == 1 else dt
+        # Single contraction over monomial weights, directions and
+        # voxels; the schedule is precomputed once per operand shape
+        monomials = np.prod(dir[:, dind], axis=-1)
+        path = self._contraction_path("adc", dcnt, monomials, dt2)
+        adc = np.einsum("m,nm,mv->nv", dcnt, monomials, dt2, optimize=path)
+        if dt.ndim == 1:
+            adc = adc[:, 0]
         return adc
 
     def kurtosisCoeff(self, dt: np.ndarray[float], dir: np.ndarray[float]) -> np.ndarray[float]:
@@ -637,17 +904,57 @@ class DWI(object):
         adc = dwi.kurtosisCoeff(dt, dir)
         """
         wcnt, wind = self.createTensorOrder(4)
-        ndir = dir.shape[0]
         adc = self.diffusionCoeff(dt[:6], dir)
         adc[adc < minZero] = minZero
         md = np.sum(dt[np.array([0, 3, 5])], 0) / 3
-        bW = (
-            np.tile(wcnt, (ndir, 1)) * dir[:, wind[:, 0]] * dir[:, wind[:, 1]] * dir[:, wind[:, 2]] * dir[:, wind[:, 3]]
-        )
-        akc = np.matmul(bW, dt[6:])
-        akc = (akc * np.tile(md**2, (adc.shape[0], 1))) / (adc**2)
+        # Accept both the batched [21 x nvox] layout and the 1-D
+        # per-voxel vector handed in by dkiTensorParams
+        kt = dt[6:].reshape(wcnt.size, -1) if dt.ndim == 1 else dt[6:]
+        # Single contraction over the 15 degree-4 monomials, scheduled
+        # once per operand shape (see _contraction_path)
+        monomials = np.prod(dir[:, wind], axis=-1)
+        path = self._contraction_path("akc", wcnt, monomials, kt)
+        akc = np.einsum("m,nm,mv->nv", wcnt, monomials, kt, optimize=path)
+        if dt.ndim == 1:
+            akc = akc[:, 0]
+        akc = (akc * md**2) / (adc**2)
         return akc
 
+    def _contraction_path(
+        self,
+        name: str,
+        cnt: np.ndarray[float],
+        monomials: np.ndarray[float],
+        dt: np.ndarray[float],
+    ) -> list:
+        """Returns a cached np.einsum_path contraction schedule for the
+        ADC/AKC polynomial evaluation, recomputing it only when the
+        operand shapes change.
+
+        Parameters
+        ----------
+        name : str
+            Cache key prefix, "adc" or "akc".
+        cnt : ndarray(dtype=float)
+            [m] monomial multiplicity vector from createTensorOrder.
+        monomials : ndarray(dtype=float)
+            [n x m] per-direction monomial values.
+        dt : ndarray(dtype=float)
+            [m x nvoxel] tensor components.
+
+        Returns
+        -------
+        path : list
+            Contraction order accepted by np.einsum's optimize keyword.
+        """
+        cache = getattr(self, "_einsum_paths", None)
+        if cache is None:
+            cache = self._einsum_paths = {}
+        key = (name, cnt.shape, monomials.shape, dt.shape)
+        if key not in cache:
+            cache[key] = np.einsum_path("m,nm,mv->nv", cnt, monomials, dt, optimize="optimal")[0]
+        return cache[key]
+
     def dtiTensorParams(self, dt: np.ndarray[float]) -> Tuple[np.ndarray[float], np.ndarray[float]]:
         """Computes sorted DTI tensor eigenvalues and eigenvectors.
 
@@ -819,6 +1126,8 @@ class DWI(object):
             dt = np.matmul(np.linalg.pinv(np.matmul(w, b)), np.matmul(w, np.log(dwi)))
         # Constrained fitting
         else:
+            import cvxpy as cvx
+
             C = np.matmul(w, b).astype("double")
             d = np.matmul(w, np.log(dwi)).astype("double").reshape(-1)
             m, n = C.shape
@@ -843,7 +1152,150 @@ class DWI(object):
                 dt = np.full(n, minZero)
         return dt
 
-    def fit(self, constraints: Union[np.ndarray[float], None] = None, reject: bool = None) -> Self:
+    def wlls_batched(
+        self,
+        shat: np.ndarray[float],
+        dwi: np.ndarray[float],
+        b: np.ndarray[float],
+        reject: Union[np.ndarray[bool], None] = None,
+        logdwi: Union[np.ndarray[float], None] = None,
+        gpu: bool = False,
+    ) -> np.ndarray[float]:
+        """Estimates diffusion and kurtosis tensors at all voxels
+        simultaneously with a single weighted linear least squares
+        solve, replacing the per-voxel Moore-Penrose loop of DWI.wlls()
+        for unconstrained fitting.
+
+        Parameters
+        ----------
+        shat: ndarray(dtype=float)
+            [ndir x nvox] array of S_hat, approximated signal
+            intensities used as weights.
+        dwi: ndarray(dtype=float)
+            [ndir x nvox] array of diffusion weighted intensity values.
+        b: ndarray(dtype=float)
+            [ndir x nparam] design matrix.
+        reject: ndarray(dtype=bool), optional
+            [ndir x nvox] array marking outlier directions to exclude
+            from estimation (Default: None).
+        logdwi: ndarray(dtype=float), optional
+            [ndir x nvox] precomputed log of dwi; avoids reallocating
+            the log-signal buffer when the caller already has one
+            (Default: None).
+        gpu: bool, optional
+            Run the batched solve on a CUDA device through cupy;
+            requires the optional gpu extra (Default: False).
+
+        Returns
+        -------
+        dt: ndarray(dtype=float)
+            [nvox x nparam] array of fitted tensors.
+
+        Examples
+        --------
+        dt = dwi.wlls_batched(shat, dwi, b, reject)
+
+        Notes
+        -----
+        Rejected directions are excluded by zeroing their weights,
+        which is equivalent to removing the corresponding rows from the
+        design matrix. The normal equations (B.T * W^2 * B) dt =
+        B.T * W^2 * log(S) are assembled for every voxel with a single
+        einsum and solved as one batched linear system, following the
+        two-step approach of Veraart et al. (2013). A ``wllsRidge``
+        Tikhonov term on the diagonal keeps marginal voxels positive
+        definite; voxels that are singular regardless are located by
+        their smallest eigenvalue and fall back to the per-voxel
+        pseudoinverse while the rest of the tile stays batched.
+
+        Voxels are processed in tiles of ``wllsBlockSize`` so the
+        normal-equations workspace stays bounded regardless of brain
+        size; with dask installed the tiles are dispatched over the
+        threaded scheduler. When numba is installed
+        (``pip install pydesigner[accel]``), the solve is instead
+        dispatched to a native-compiled kernel that parallelizes over
+        voxels with prange and needs no tiling. With ``gpu=True`` the
+        tiles are instead streamed through cupy and solved on a CUDA
+        device, transferring the design matrix once.
+        """
+        w2 = np.square(shat)
+        if reject is not None:
+            w2 = np.where(reject, 0, w2)
+        if logdwi is None:
+            logdwi = np.log(dwi)
+        nvox = dwi.shape[1]
+        bounds = [(i0, min(i0 + wllsBlockSize, nvox)) for i0 in range(0, nvox, wllsBlockSize)]
+        if gpu:
+            cp = _cupy()
+            # Design matrix goes over once; voxel tiles are streamed so
+            # the normal-equations workspace stays within VRAM
+            b_gpu = cp.asarray(b, dtype=cp.float32)
+            dt = np.empty((nvox, b.shape[1]), dtype=np.float32)
+            for i0, i1 in bounds:
+                w2_gpu = cp.asarray(w2[:, i0:i1], dtype=cp.float32)
+                rhs_gpu = w2_gpu * cp.asarray(logdwi[:, i0:i1], dtype=cp.float32)
+                A = cp.einsum("nk,nv,nl->vkl", b_gpu, w2_gpu, b_gpu)
+                A += wllsRidge * cp.eye(b.shape[1], dtype=cp.float32)
+                rhs = cp.einsum("nk,nv->vk", b_gpu, rhs_gpu)
+                dt[i0:i1] = cp.linalg.solve(A, rhs[..., None])[..., 0].get()
+            return dt
+        if _HAS_NUMBA:
+            try:
+                return _wlls_fit_all(
+                    np.ascontiguousarray(b),
+                    np.ascontiguousarray(w2),
+                    np.ascontiguousarray(logdwi),
+                )
+            except np.linalg.LinAlgError:
+                # Singular voxel; drop through to the NumPy path and
+                # its per-voxel pseudoinverse fallback
+                pass
+        w2y = w2 * logdwi
+        nparam = b.shape[1]
+        # Tiny Tikhonov ridge; negligible against the signal-scaled
+        # normal equations but keeps marginal voxels positive definite
+        # in single precision
+        ridge = wllsRidge * np.eye(nparam, dtype=b.dtype)
+
+        def solve_block(i0: int, i1: int) -> np.ndarray[float]:
+            A = np.einsum("nk,nv,nl->vkl", b, w2[:, i0:i1], b) + ridge
+            rhs = np.einsum("nk,nv->vk", b, w2y[:, i0:i1])
+            try:
+                return np.linalg.solve(A, rhs[..., None])[..., 0]
+            except np.linalg.LinAlgError:
+                # Localize the singular voxels through the smallest
+                # eigenvalue instead of retreating to the per-voxel
+                # pseudoinverse for the whole block
+                dt = np.zeros((i1 - i0, nparam))
+                good = np.linalg.eigvalsh(A)[:, 0] > 0
+                if good.any():
+                    dt[good] = np.linalg.solve(A[good], rhs[good][..., None])[..., 0]
+                for j in np.flatnonzero(~good):
+                    i = i0 + j
+                    if reject is not None:
+                        keep = ~reject[:, i]
+                    else:
+                        keep = np.ones(dwi.shape[0], dtype=bool)
+                    dt[j] = self.wlls(shat[keep, i], dwi[keep, i], b[keep])
+                return dt
+
+        if len(bounds) > 1:
+            try:
+                from dask import compute, delayed
+            except ImportError:
+                compute = None
+            if compute is not None:
+                tasks = [delayed(solve_block)(i0, i1) for (i0, i1) in bounds]
+                return np.concatenate(compute(*tasks, scheduler="threads"), axis=0)
+            return np.concatenate([solve_block(i0, i1) for (i0, i1) in bounds], axis=0)
+        return solve_block(*bounds[0])
+
+    def fit(
+        self,
+        constraints: Union[np.ndarray[float], None] = None,
+        reject: bool = None,
+        gpu: bool = False,
+    ) -> Self:
         """Returns fitted diffusion or kurtosis tensor
 
         Parameters
@@ -854,6 +1306,9 @@ class DWI(object):
         reject: ndarray(dtype=bool)
             4D array containing information on voxels to exclude
             from DT estimation (Default: None)
+        gpu: bool
+            Run the unconstrained batched solve on a CUDA device
+            through cupy; ignored for constrained fits (Default: False)
 
         Examples
         --------
@@ -864,59 +1319,25 @@ class DWI(object):
         exclude_idx = self.idxdki()
         if reject is None:
             reject = np.zeros(self.img[:, :, :, exclude_idx].shape)
-        grad = self.grad[exclude_idx, :]
-        grad_orig = grad
-        order = np.floor(np.log(np.abs(np.max(grad[:, -1]) + 1)) / np.log(10))
         img = self.img[:, :, :, exclude_idx]
-        if order >= 2:
-            grad[:, -1] = grad[:, -1]
-        img.astype(np.double)
-        img[img <= 0] = np.finfo(np.double).eps
-        grad.astype(np.double)
-        normgrad = np.sqrt(np.sum(grad[:, :3] ** 2, 1))
-        normgrad[normgrad == 0] = 1
-        grad[:, :3] = grad[:, :3] / np.tile(normgrad, (3, 1)).T
-        grad[np.isnan(grad)] = 0
-        dcnt, dind = self.createTensorOrder(2)
-        wcnt, wind = self.createTensorOrder(4)
-        ndwis = img.shape[-1]
-        bs = np.ones((ndwis, 1))
-        bD = np.tile(dcnt, (ndwis, 1)) * grad[:, dind[:, 0]] * grad[:, dind[:, 1]]
-        bW = (
-            np.tile(wcnt, (ndwis, 1))
-            * grad_orig[:, wind[:, 0]]
-            * grad_orig[:, wind[:, 1]]
-            * grad_orig[:, wind[:, 2]]
-            * grad_orig[:, wind[:, 3]]
-        )
-        self.b = np.concatenate(
-            (
-                bs,
-                (np.tile(-self.grad[exclude_idx, -1], (6, 1)).T * bD),
-                np.squeeze(1 / 6 * np.tile(self.grad[exclude_idx, -1], (15, 1)).T ** 2) * bW,
-            ),
-            1,
-        )
+        # Clip in place; the boolean-mask assignment allocated a full
+        # 4D scratch mask on every fit
+        np.maximum(img, np.finfo(np.double).eps, out=img)
+        # The design matrix is a pure function of the gradient scheme
+        # and is memoized across fits and instances
+        self.b = _design_matrix(self.grad[exclude_idx, :])
         dwi_ = vectorize(img, self.mask)
         reject_ = vectorize(reject, self.mask).astype(bool)
-        init = np.matmul(np.linalg.pinv(self.b), np.log(dwi_))
+        # Reuse one log-signal buffer across the initial estimate and
+        # the WLLS solve instead of materializing log(S) twice
+        if self._logbuf is None or self._logbuf.shape != dwi_.shape or self._logbuf.dtype != dwi_.dtype:
+            self._logbuf = np.empty(dwi_.shape, dtype=dwi_.dtype)
+        np.log(dwi_, out=self._logbuf)
+        init = np.matmul(np.linalg.pinv(self.b), self._logbuf)
         shat = highprecisionexp(np.matmul(self.b, init))
         if constraints is None or (constraints[0] == 0 and constraints[1] == 0 and constraints[2] == 0):
-            inputs = tqdm(
-                range(0, dwi_.shape[1]),
-                desc="Unconstrained Tensor Fit",
-                bar_format="{desc}: [{percentage:0.0f}%]",
-                unit="vox",
-                ncols=tqdmWidth,
-            )
-            self.dt = Parallel(n_jobs=self.workers, prefer="processes")(
-                delayed(self.wlls)(
-                    shat[~reject_[:, i], i],
-                    dwi_[~reject_[:, i], i],
-                    self.b[~reject_[:, i]],
-                )
-                for i in inputs
-            )
+            tqdm.write("Unconstrained Tensor Fit: solving all {} voxels " "in one batch".format(dwi_.shape[1]))
+            self.dt = self.wlls_batched(shat, dwi_, self.b, reject=reject_, logdwi=self._logbuf, gpu=gpu)
         else:
             # C is linear inequality constraint matrix A_ub
             C = self.createConstraints(constraints)
@@ -1267,6 +1688,8 @@ class DWI(object):
         min_cost_fn: array_like(dtype=float)
             Cost function
         """
+        from ..tractography import odf, sphericalsampling
+
         # --------------------FUNCTION SEPARATOR-----------------------
 
         def __fbi_rectify(fodf, sh_area, iter=1000):
@@ -2230,6 +2653,14 @@ class DWI(object):
         Examples
         --------
         outliers = dwi.irlls()
+
+        Notes
+        -----
+        Every estimation step here is closed-form linear least squares
+        on the log-signal (np.linalg.lstsq on the reweighted design
+        matrix); no non-linear optimizer or finite-difference Jacobian
+        is involved, so the robust stage already avoids the extra
+        model evaluations a MINPACK-style fit would incur.
         """
         # if not excludeb0.dtype:
         #     assert('option: Excludeb0 should be set to True or False')
@@ -2701,6 +3132,7 @@ def fit_regime(
     n_fibers: int = 5,
     mask: Union[str, None] = None,
     nthreads: Union[int, None] = None,
+    gpu: bool = False,
 ) -> None:
     """Performs the entire tensor fitting regime and writes out maps.
     Uses auto-detections methods to determine the types of protocols
@@ -2747,7 +3179,14 @@ def fit_regime(
         Number of workers to use in processing. Default value uses all
         available workers.
         (Default: None)
+    gpu : bool
+        Run the unconstrained tensor fit on a CUDA device through
+        cupy. Requires the optional gpu extra.
+        (Default: False)
     """
+    from ..plotting import outlierplot
+    from ..tractography import dsistudio, odf
+
     if prefix is None:
         prefix = ""
     if suffix is None:
@@ -2812,9 +3251,9 @@ def fit_regime(
                     )
                 os.remove(bvals_outlier_full)
     if irlls:
-        img.fit(fit_constraints, reject=outliers)
+        img.fit(fit_constraints, reject=outliers, gpu=gpu)
     else:
-        img.fit(fit_constraints)
+        img.fit(fit_constraints, gpu=gpu)
     if akc and img.isdki():
         akc_out = img.akcoutliers()
         img.akccorrect(akc_out)
@@ -0,0 +1,3 @@
+"""PyDesigner package information"""
+
+__version__ = "2.0.0"
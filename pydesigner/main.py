@@ -2,6 +2,7 @@
 """
 
 import argparse  # ArgumentParser, add_argument
+import functools  # lru_cache
 import glob  # recursive file search
 import json
 import os  # mkdir
@@ -10,6 +11,7 @@ import shutil  # which, rmtree
 import subprocess  # subprocess
 import sys as sys
 import textwrap  # dedent
+from concurrent.futures import ThreadPoolExecutor  # concurrent shell extraction
 
 import numpy as np  # array, ndarray
 
@@ -22,24 +24,58 @@ from .preprocessing import mrinfoutil, mrpreproc, util
 DWIFile = util.DWIFile
 DWIParser = util.DWIParser
 
-# Locate mrtrix3 via which-ing dwidenoise
-dwidenoise_location = shutil.which("dwidenoise")
-if dwidenoise_location is None:
-    raise Exception("Cannot find mrtrix3, please see " "https://github.com/m-ama/PyDesigner/wiki" " to troubleshoot.")
+# External tool discovery is deferred to the entrypoint so importing
+# this module (e.g. from dask/joblib workers or test runners) does not
+# hit the filesystem or fail on machines without mrtrix3/FSL
 
-# Extract mrtrix3 path from dwidenoise_location
-mrtrix3path = op.dirname(dwidenoise_location)
 
-# Locate FSL via which-ing fsl
-fsl_location = shutil.which("eddy_cuda")
-if fsl_location is None:
-    raise Exception("Cannot find FSL, please see " "https://github.com/m-ama/PyDesigner/wiki" " to troubleshoot.")
+@functools.lru_cache(maxsize=None)
+def _mrtrix3_path() -> str:
+    """Locates mrtrix3 by which-ing dwidenoise; cached after the first
+    lookup."""
+    dwidenoise_location = shutil.which("dwidenoise")
+    if dwidenoise_location is None:
+        raise Exception(
+            "Cannot find mrtrix3, please see " "https://github.com/m-ama/PyDesigner/wiki" " to troubleshoot."
+        )
+    return op.dirname(dwidenoise_location)
+
+
+@functools.lru_cache(maxsize=None)
+def _fsl_path() -> str:
+    """Locates FSL by which-ing eddy_cuda; cached after the first
+    lookup."""
+    fsl_location = shutil.which("eddy_cuda")
+    if fsl_location is None:
+        raise Exception("Cannot find FSL, please see " "https://github.com/m-ama/PyDesigner/wiki" " to troubleshoot.")
+    return op.dirname(fsl_location)
+
+
+def _intcsv(value):
+    """argparse type for comma-separated integers; validates once at
+    parse time and hands a tuple to the rest of the pipeline instead of
+    a string that gets re-split downstream.
+
+    Parameters
+    ----------
+    value : str
+        Comma-separated integers, e.g. "5,5,5"
 
-# Extract FSL path from fsl_location
-fslpath = op.dirname(fsl_location)
+    Returns
+    -------
+    tuple of int
+        Parsed integer values
+    """
+    try:
+        return tuple(int(x) for x in value.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError("{} is not a comma-separated list of integers".format(value))
 
 
 def main():
+    # Fail fast if the external toolchains are missing
+    _mrtrix3_path()
+    _fsl_path()
     # -----------------------------------------------------------------
     # Parse Arguments
     # -----------------------------------------------------------------
@@ -137,7 +173,8 @@ def main():
     parser.add_argument(
         "--extent",
         metavar="n,n,n",
-        default="5,5,5",
+        type=_intcsv,
+        default=(5, 5, 5),
         help="Denoising extent formatted n,n,n (forces " " denoising. " "Default: 5,5,5.",
     )
     parser.add_argument(
@@ -291,10 +328,17 @@ def main():
     )
     parser.add_argument(
         "--fit_constraints",
-        default="0,1,0",
+        type=_intcsv,
+        default=(0, 1, 0),
         metavar="D>0,K>0,K < 3/(b*D)",
         help="Constrain the WLLS fit. " "Default: 0,1,0.",
     )
+    parser.add_argument(
+        "--gpu",
+        action="store_true",
+        default=False,
+        help="Run the unconstrained tensor fit on a CUDA device. " "Requires cupy (pip install pydesigner[gpu]).",
+    )
     parser.add_argument(
         "--l_max",
         default=6,
@@ -466,7 +510,7 @@ def main():
     # (Extent or Degibbs) and no Denoise
     if not args.denoise:
         stdmsg = "No --denoise but "
-        if args.extent != "5,5,5":
+        if args.extent != (5, 5, 5):
             warningmsg += stdmsg + "--extent given; overriding with --denoise\n"
             args.denoise = True
         if args.rician:
@@ -499,8 +543,8 @@ def main():
             except:  # noqa: E722
                 errmsg += "Cannot find or create output directory"
 
-    # Check that --fit_constraints can be converted to int array
-    fit_constraints = np.fromstring(args.fit_constraints, dtype=int, sep=",")
+    # Check that --fit_constraints values are valid flags
+    fit_constraints = np.array(args.fit_constraints, dtype=int)
     for i in fit_constraints:
         if i < 0 or i > 1:
             errmsg += "Invalid --fit_constraints value, should be 0 or 1\n"
@@ -666,7 +710,7 @@ def main():
                 input=working_path,
                 output=mif_denoised,
                 noisemap=True,
-                extent=args.extent,
+                extent=",".join(str(n) for n in args.extent),
                 nthreads=args.nthreads,
                 force=args.force,
                 verbose=args.verbose,
@@ -1018,21 +1062,32 @@ def main():
     b_names = ["B" + str(x) for x in b_shells]
     b_paths = [op.join(outpath, x + ".nii") for x in b_names]
     # check to see if this already exists
-    for b_value, b_nii in zip(b_shells, b_paths):
-        if not (args.resume and op.exists(b_nii)):
-            # extract mean shells
-            mrpreproc.extractmeanshell(
-                input=working_path,
-                output=b_nii,
-                shell=b_value,
-                nthreads=args.nthreads,
-                force=args.force,
-                verbose=args.verbose,
-            )
-            # update command history
+    shells_to_extract = [
+        (b_value, b_nii) for b_value, b_nii in zip(b_shells, b_paths) if not (args.resume and op.exists(b_nii))
+    ]
+    if shells_to_extract:
+        # each shell extraction is an independent external process that
+        # only reads working_path, so overlap their wall-clock time;
+        # threads suffice because the work is a blocking subprocess wait
+        with ThreadPoolExecutor(max_workers=len(shells_to_extract)) as pool:
+            jobs = [
+                pool.submit(
+                    mrpreproc.extractmeanshell,
+                    input=working_path,
+                    output=b_nii,
+                    shell=b_value,
+                    nthreads=args.nthreads,
+                    force=args.force,
+                    verbose=args.verbose,
+                )
+                for b_value, b_nii in shells_to_extract
+            ]
+            for job in jobs:
+                job.result()
+        # update command history and nifti file tracking in shell order
+        for b_value, b_nii in shells_to_extract:
             cmdtable["B" + str(b_value)] = mrinfoutil.commandhistory(working_path)[-1]
             cmdtable["HEAD"] = cmdtable["B" + str(b_value)]
-            # update nifti file tracking
             filetable["B" + str(b_value)] = DWIFile(b_nii)
             filetable["HEAD"] = filetable["B" + str(b_value)]
 
@@ -1113,26 +1168,47 @@ def main():
     if not args.nofit:
         # create dwi fitting object
         if multi_echo and args.multite:
+            os.makedirs(qcpath, exist_ok=True)
+            # Each TE is fit independently, so the fits form an
+            # embarrassingly-parallel task graph; run them through dask
+            # worker processes when dask is installed
+            try:
+                from dask import compute, delayed
+            except ImportError:
+                compute = None
+                delayed = None
+            fit_kwargs = []
             for path, echo in zip(imPath, image.echotime):
-                # qcpath = op.join(op.dirname(path), 'qc_fitting')
-                os.makedirs(qcpath, exist_ok=True)
-                dp.fit_regime(
-                    input=path,
-                    output=metricpath,
-                    prefix="TE" + str(echo) + "_",
-                    suffix=None,
-                    ext=ext,
-                    irlls=not args.nooutliers,
-                    akc=args.akc,
-                    l_max=args.l_max,
-                    res=args.t_res,
-                    n_fibers=args.t_fibers,
-                    rectify=fbi_rectify,
-                    qcpath=fitqcpath,
-                    fit_constraints=fit_constraints,
-                    mask=fit_mask,
-                    nthreads=args.nthreads,
+                fit_kwargs.append(
+                    dict(
+                        input=path,
+                        output=metricpath,
+                        prefix="TE" + str(echo) + "_",
+                        suffix=None,
+                        ext=ext,
+                        irlls=not args.nooutliers,
+                        akc=args.akc,
+                        l_max=args.l_max,
+                        res=args.t_res,
+                        n_fibers=args.t_fibers,
+                        rectify=fbi_rectify,
+                        qcpath=fitqcpath,
+                        fit_constraints=fit_constraints,
+                        mask=fit_mask,
+                        nthreads=args.nthreads,
+                        gpu=args.gpu,
+                    )
+                )
+            if delayed is not None and len(fit_kwargs) > 1:
+                tasks = [delayed(dp.fit_regime)(**kwargs) for kwargs in fit_kwargs]
+                compute(
+                    *tasks,
+                    scheduler="processes",
+                    num_workers=min(len(tasks), os.cpu_count()),
                 )
+            else:
+                for kwargs in fit_kwargs:
+                    dp.fit_regime(**kwargs)
         else:
             dp.fit_regime(
                 input=imPath,
@@ -1150,6 +1226,7 @@ def main():
                 fit_constraints=fit_constraints,
                 mask=fit_mask,
                 nthreads=args.nthreads,
+                gpu=args.gpu,
             )
 
     # -----------------------------------------------------------------
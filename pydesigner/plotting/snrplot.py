@@ -6,7 +6,7 @@ import nibabel as nib
 import numpy as np
 from scipy.interpolate import make_interp_spline
 
-from ..system.utils import vectorize
+from ..system.utils import fast_nii_load, vectorize
 
 minZero = 1e-8
 np.seterr(all="ignore")
@@ -62,10 +62,11 @@ class makesnr:
         self.hdr = nib.load(dwilist[0])
         if self.hdr.ndim != 4:
             raise IOError("Input DWIs need are not 4D. Please ensure you " "use 4D NifTi files only.")
-        # Load image into 2D array
-        self.img = np.array(self.hdr.dataobj)
+        # Load image into 2D array; memory-mapped when possible since
+        # vectorize copies the masked voxels out anyway
+        self.img = fast_nii_load(dwilist[0])
         # Load noise into a vector
-        self.noise = np.array(nib.load(noisepath).dataobj)
+        self.noise = fast_nii_load(noisepath)
         # Load BVAL
         fName = op.splitext(dwilist[0])[0]
         bvalPath = op.join(fName + ".bval")
@@ -74,7 +75,7 @@ class makesnr:
         else:
             raise IOError("BVAL file {} not found".format(bvalPath))
         if maskpath is not None and op.exists(maskpath):
-            self.mask = np.array(nib.load(maskpath).dataobj).astype(bool)
+            self.mask = fast_nii_load(maskpath).astype(bool)
             self.maskStatus = True
         else:
             self.mask = np.ones((self.img.shape[0], self.img.shape[1], self.img.shape[2]), order="F")
@@ -87,7 +88,7 @@ class makesnr:
             # From second image to last image
             for i in range(1, self.nDWI):
                 try:
-                    tmp = vectorize(np.array(nib.load(dwilist[i]).dataobj), self.mask)
+                    tmp = vectorize(fast_nii_load(dwilist[i]), self.mask)
                     self.img = np.dstack((self.img, tmp))
                 except:  # noqa: E722
                     raise ValueError("all input DWIs must have the same " "shape.")
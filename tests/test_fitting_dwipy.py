@@ -82,6 +82,31 @@ def test_dwi_paths_valid(capsys):
     assert "workers..." in captured.out
 
 
+def test_dwi_img_lazy_load():
+    """Tests whether image array is materialized lazily on first access"""
+    dwi = DWI(PATH_DWI, bvecPath=PATH_BVEC, bvalPath=PATH_BVAL, mask=PATH_MASK)
+    assert dwi._img is None
+    assert dwi.img.shape == (2, 2, 2, 337)
+    assert dwi._img is not None
+
+
+def test_dwi_get_block():
+    """Tests whether function returns requested sub-volume only"""
+    dwi = DWI(PATH_DWI, bvecPath=PATH_BVEC, bvalPath=PATH_BVAL, mask=PATH_MASK)
+    block = dwi.get_block(zslice=slice(0, 1), vol_slice=slice(0, 10))
+    assert block.shape == (2, 2, 1, 10)
+    np.testing.assert_array_equal(block, dwi.img[:, :, 0:1, 0:10])
+
+
+def test_dwi_iter_zslabs():
+    """Tests whether z-slab iteration covers the whole volume"""
+    dwi = DWI(PATH_DWI, bvecPath=PATH_BVEC, bvalPath=PATH_BVAL, mask=PATH_MASK)
+    slabs = list(dwi.iter_zslabs(nz=1))
+    assert [z0 for z0, _ in slabs] == [0, 1]
+    stacked = np.concatenate([slab for _, slab in slabs], axis=2)
+    np.testing.assert_array_equal(stacked, dwi.img)
+
+
 def test_dwi_get_bvals():
     """Tests whether function returns correct bvals"""
     dwi = DWI(PATH_DWI, bvecPath=PATH_BVEC, bvalPath=PATH_BVAL, mask=PATH_MASK)
@@ -230,6 +255,27 @@ def test_dwi_tensor_order_auto_detect():
     assert np.shape(ind) == (15, 4)
 
 
+def test_dwi_kurtosis_coeff_per_voxel_tensor():
+    """Tests whether AKC evaluation accepts a 1-D per-voxel tensor"""
+    dwi = DWI(PATH_DWI, bvecPath=PATH_BVEC, bvalPath=PATH_BVAL, mask=PATH_MASK)
+    dwi.fit()
+    dirs = dwi.fibonacciSphere(30)
+    akc1 = dwi.kurtosisCoeff(dwi.dt[:, 0], dirs)
+    assert akc1.shape == (30,)
+    akc2 = dwi.kurtosisCoeff(dwi.dt, dirs)
+    np.testing.assert_allclose(akc1, akc2[:, 0], rtol=1e-6)
+
+
+def test_dwi_extract_dki():
+    """Tests whether DKI parameter extraction runs after a tensor fit"""
+    dwi = DWI(PATH_DWI, bvecPath=PATH_BVEC, bvalPath=PATH_BVAL, mask=PATH_MASK)
+    dwi.fit()
+    dwi.extractDTI()
+    mk, rk, ak, kfa, mkt, trace = dwi.extractDKI()
+    assert mk.shape == (2, 2, 2)
+    assert np.isfinite(mk[dwi.mask.astype(bool)]).all()
+
+
 def test_fibonacci_sphere_invalid_samnples():
     """Tests whether function returns correct response from invalid samples type"""
     dwi = DWI(PATH_DWI, bvecPath=PATH_BVEC, bvalPath=PATH_BVAL, mask=PATH_MASK)
@@ -0,0 +1,22 @@
+import argparse
+
+import pytest
+
+from pydesigner.main import _intcsv
+
+
+def test_main_importable_without_toolchains():
+    """Tests whether module imports without mrtrix3/FSL installed"""
+    import pydesigner.main  # noqa: F401
+
+
+def test_intcsv_valid():
+    """Tests whether function parses comma-separated integers"""
+    assert _intcsv("5,5,5") == (5, 5, 5)
+    assert _intcsv("0,1,0") == (0, 1, 0)
+
+
+def test_intcsv_invalid():
+    """Tests whether function raises ArgumentTypeError on bad input"""
+    with pytest.raises(argparse.ArgumentTypeError):
+        _intcsv("a,b,c")
@@ -0,0 +1,26 @@
+import os
+from pathlib import Path
+
+import nibabel as nib
+import numpy as np
+
+from pydesigner.system.utils import fast_nii_load
+
+TEST_DIR = Path(__file__).parent
+PATH_DWI = os.path.join(TEST_DIR, "data", "hifi_splenium_4vox.nii")
+PATH_MASK = os.path.join(TEST_DIR, "data", "brain_mask.nii")
+
+
+def test_fast_nii_load_memmaps_unscaled_nii():
+    """Tests whether unscaled .nii files are loaded as memory maps"""
+    img = fast_nii_load(PATH_DWI)
+    assert isinstance(img, np.memmap)
+    assert img.shape == (2, 2, 2, 337)
+
+
+def test_fast_nii_load_matches_nibabel():
+    """Tests whether loaded values match a regular nibabel load"""
+    for path in (PATH_DWI, PATH_MASK):
+        fast = np.asarray(fast_nii_load(path))
+        ref = np.asanyarray(nib.load(path).dataobj)
+        np.testing.assert_array_equal(fast, ref)